@@ -1,9 +1,16 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from datetime import datetime
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+import pyarrow as pa
+import pyarrow.compute as pc
+from tsdownsample import MinMaxLTTBDownsampler
+from loaders import load_sales_data, load_sku_data
 
 warnings.filterwarnings("ignore")
 
@@ -29,65 +36,22 @@ h2 { color: #3498db; }
 """, unsafe_allow_html=True)
 
 # =========================
-# DATA LOADERS
+# CHART TEMPLATE
 # =========================
-@st.cache_data
-def load_excel(path):
-    try:
-        df = pd.read_excel(path)
-        df.columns = (
-            df.columns.str.strip()
-            .str.upper()
-            .str.replace(" ", "_")
-        )
-        return df
-    except Exception as e:
-        st.error(f"Error loading {path}: {e}")
-        return pd.DataFrame()
-
-@st.cache_data
-def prepare_sales_data(df):
-    date_cols = ["ORDER_DATE", "DATE", "CREATION_DATE"]
-    for col in date_cols:
-        if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
-            df["ORDER_DATE"] = df[col]
-            break
-
-    numeric_cols = ["TOTAL_VALUES", "TOTAL_COMMISSION", "TOTAL_ITEM"]
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-    if "ORDER_DATE" in df.columns:
-        df["YEAR_MONTH"] = df["ORDER_DATE"].dt.to_period("M").astype(str)
-
-    return df
-
-@st.cache_data
-def prepare_sku_data(df):
-    mapping = {
-        "ORDER_LINES/PRODUCT/REFERENCE": "SKU",
-        "ORDER_LINES/PRODUCT/NAME": "PRODUCT_NAME",
-        "ORDER_LINES/QUANTITY": "QUANTITY",
-        "ORDER_LINES/UNIT_PRICE": "UNIT_PRICE",
-        "ORDER_LINES/TOTAL": "LINE_TOTAL",
-        "CREATION_DATE": "ORDER_DATE",
-    }
-
-    for old, new in mapping.items():
-        if old in df.columns:
-            df.rename(columns={old: new}, inplace=True)
-
-    for col in ["QUANTITY", "UNIT_PRICE", "LINE_TOTAL"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-    if "LINE_TOTAL" in df.columns and df["LINE_TOTAL"].sum() == 0:
-        if "QUANTITY" in df.columns and "UNIT_PRICE" in df.columns:
-            df["LINE_TOTAL"] = df["QUANTITY"] * df["UNIT_PRICE"]
+pio.templates["dash"] = go.layout.Template(
+    layout=dict(
+        height=400,
+        font=dict(size=13),
+        margin=dict(l=40, r=20, t=40, b=40),
+    )
+)
+pio.templates.default = "streamlit+dash"
 
-    return df
+# =========================
+# DISPLAY LIMITS
+# =========================
+# Max points sent to the browser for a single line trace
+TREND_POINTS = 500
 
 # =========================
 # METRICS
@@ -97,9 +61,133 @@ def calculate_metrics(df):
         "revenue": df["TOTAL_VALUES"].sum() if "TOTAL_VALUES" in df.columns else 0,
         "orders": len(df),
         "customers": df["CUSTOMER_ID"].nunique() if "CUSTOMER_ID" in df.columns else 0,
-        "avg_order": df["TOTAL_VALUES"].mean() if "TOTAL_VALUES" in df.columns else 0,
+        "avg_order": df["TOTAL_VALUES"].mean() if "TOTAL_VALUES" in df.columns and len(df) else 0,
     }
 
+# =========================
+# AGGREGATES
+# =========================
+# Largest top-N offered by the tab sliders; rollups keep only this many rows
+MAX_TOP_N = 30
+
+# Every column the rollups read; frame_hash covers exactly these so the
+# aggregate_all cache key changes whenever any rollup input does
+ROLLUP_COLUMNS = [
+    "SALE_REPRESENTATIVE", "CUSTOMER_ID", "CUSTOMER_NAME", "YEAR_MONTH_CODE",
+    "TOTAL_VALUES", "ORDER_NUMBER", "TOTAL_COMMISSION",
+]
+
+# Output column -> (input column, Arrow aggregate)
+REP_AGG = {
+    "REVENUE": ("TOTAL_VALUES", "sum"),
+    "ORDERS": ("ORDER_NUMBER", "count"),
+    "CUSTOMERS": ("CUSTOMER_ID", "count_distinct"),
+    "COMMISSION": ("TOTAL_COMMISSION", "sum"),
+}
+
+CUSTOMER_AGG = {
+    "REVENUE": ("TOTAL_VALUES", "sum"),
+    "ORDERS": ("ORDER_NUMBER", "count"),
+}
+
+MONTHLY_AGG = {
+    "REVENUE": ("TOTAL_VALUES", "sum"),
+}
+
+# Display headers for the rollup tables
+ROLLUP_LABELS = {
+    "SALE_REPRESENTATIVE": "Sales Rep",
+    "CUSTOMER_ID": "Customer ID",
+    "CUSTOMER_NAME": "Customer",
+    "REVENUE": st.column_config.NumberColumn("Revenue", format="$%.0f"),
+    "ORDERS": "Orders",
+    "CUSTOMERS": "Customers",
+    "COMMISSION": st.column_config.NumberColumn("Commission", format="$%.0f"),
+}
+
+def frame_hash(df):
+    cols = [c for c in ROLLUP_COLUMNS if c in df.columns]
+    return int(pd.util.hash_pandas_object(df[cols]).sum())
+
+def group_aggregate(tbl, keys, spec):
+    # Arrow keeps null keys as a group; drop them like pandas' groupby does,
+    # in one filter pass and only when some key actually has nulls
+    nullable = [k for k in keys if tbl[k].null_count]
+    if nullable:
+        valid = pc.is_valid(tbl[nullable[0]])
+        for key in nullable[1:]:
+            valid = pc.and_(valid, pc.is_valid(tbl[key]))
+        tbl = tbl.filter(valid)
+
+    spec = {name: (c, f) for name, (c, f) in spec.items() if c in tbl.column_names}
+    out = tbl.group_by(keys).aggregate(list(spec.values()))
+    names = {f"{c}_{f}": name for name, (c, f) in spec.items()}
+    out = out.rename_columns([names.get(n, n) for n in out.column_names])
+    return out.select(keys + list(spec))
+
+def top_k(tbl, k, column):
+    if tbl.num_rows == 0:
+        return tbl.to_pandas()
+    idx = pc.select_k_unstable(tbl, k=k, sort_keys=[(column, "descending")])
+    return tbl.take(idx).to_pandas()
+
+def monthly_rollup(tbl):
+    monthly = (
+        group_aggregate(tbl, ["YEAR_MONTH_CODE"], MONTHLY_AGG)
+        .to_pandas()
+        .sort_values("YEAR_MONTH_CODE", ignore_index=True)
+    )
+    monthly["YEAR_MONTH"] = pd.PeriodIndex.from_ordinals(
+        monthly["YEAR_MONTH_CODE"], freq="M"
+    ).astype(str)
+    return monthly
+
+@st.cache_resource
+def rollup_executor():
+    # Shared across reruns and sessions; the rollups release the GIL in Arrow
+    return ThreadPoolExecutor(max_workers=3)
+
+@st.cache_data
+def aggregate_all(df_hash, _df):
+    # _df is skipped by Streamlit's hasher; df_hash identifies the filtered frame
+    df = _df
+
+    if "TOTAL_VALUES" not in df.columns:
+        return {}
+
+    tbl = pa.Table.from_pandas(
+        df[[c for c in ROLLUP_COLUMNS if c in df.columns]], preserve_index=False
+    )
+
+    ex = rollup_executor()
+    futures = {}
+
+    if "SALE_REPRESENTATIVE" in df.columns:
+        futures["rep"] = ex.submit(
+            lambda: top_k(
+                group_aggregate(tbl, ["SALE_REPRESENTATIVE"], REP_AGG),
+                MAX_TOP_N, "REVENUE",
+            )
+        )
+
+    if "CUSTOMER_ID" in df.columns:
+        keys = [c for c in ["CUSTOMER_ID", "CUSTOMER_NAME"] if c in df.columns]
+        futures["cust"] = ex.submit(
+            lambda: top_k(
+                group_aggregate(tbl, keys, CUSTOMER_AGG),
+                MAX_TOP_N, "REVENUE",
+            )
+        )
+
+    if "YEAR_MONTH_CODE" in df.columns:
+        futures["monthly"] = ex.submit(monthly_rollup, tbl)
+
+    return {name: fut.result() for name, fut in futures.items()}
+
+def money_labels(values):
+    # astype(str): an empty .map keeps int64, which can't be added to "$"
+    return "$" + values.round().astype("int64").map("{:,}".format).astype(str)
+
 # =========================
 # MAIN APP
 # =========================
@@ -108,16 +196,13 @@ def main():
     st.markdown("### Complete Sales Intelligence System")
 
     # Load data from repo
-    df = load_excel("Sales_Analysis_Results.xlsx")
-    df_sku = load_excel("Client_Status_Analysis.xlsx")
+    df, data_key = load_sales_data("Sales_Analysis_Results.xlsx")
+    df_sku = load_sku_data("Client_Status_Analysis.xlsx")
 
     if df.empty:
         st.warning("No sales data found")
         return
 
-    df = prepare_sales_data(df)
-    df_sku = prepare_sku_data(df_sku)
-
     st.success(f"✅ Loaded {len(df):,} sales records")
 
     # =========================
@@ -125,6 +210,8 @@ def main():
     # =========================
     st.sidebar.header("🔍 Filters")
 
+    date_range = selected_reps = selected_status = None
+
     if "ORDER_DATE" in df.columns:
         min_d = df["ORDER_DATE"].min().date()
         max_d = df["ORDER_DATE"].max().date()
@@ -133,10 +220,42 @@ def main():
             "Date range", (min_d, max_d), min_d, max_d
         )
 
-        df = df[
-            (df["ORDER_DATE"].dt.date >= date_range[0]) &
-            (df["ORDER_DATE"].dt.date <= date_range[1])
-        ]
+    if "SALE_REPRESENTATIVE" in df.columns:
+        reps = ["All"] + df["SALE_REPRESENTATIVE"].cat.categories.tolist()
+        selected_reps = st.sidebar.multiselect("Sales rep", reps, default=["All"])
+
+    if "STATUS" in df.columns:
+        statuses = ["All"] + df["STATUS"].cat.categories.tolist()
+        selected_status = st.sidebar.multiselect("Status", statuses, default=["All"])
+
+    # Only re-mask when the data or a filter widget changed, not on tab-local widgets
+    filter_sig = (
+        data_key,
+        date_range,
+        tuple(selected_reps or ()),
+        tuple(selected_status or ()),
+    )
+    if st.session_state.get("filter_sig") != filter_sig:
+        mask = np.ones(len(df), dtype=bool)
+
+        if date_range is not None:
+            lo = pd.Timestamp(date_range[0]).to_datetime64()
+            hi = (pd.Timestamp(date_range[1]) + pd.Timedelta(days=1)).to_datetime64()
+            order_dates = df["ORDER_DATE"].values
+            mask &= (order_dates >= lo) & (order_dates < hi)
+
+        if selected_reps is not None and "All" not in selected_reps:
+            mask &= df["SALE_REPRESENTATIVE"].isin(selected_reps).to_numpy()
+
+        if selected_status is not None and "All" not in selected_status:
+            mask &= df["STATUS"].isin(selected_status).to_numpy()
+
+        st.session_state.filtered = df.loc[mask]
+        st.session_state.filtered_hash = frame_hash(st.session_state.filtered)
+        st.session_state.filter_sig = filter_sig
+
+    df = st.session_state.filtered
+    aggs = aggregate_all(st.session_state.filtered_hash, df)
 
     # =========================
     # TABS
@@ -158,11 +277,53 @@ def main():
         c4.metric("📊 Avg Order", f"${metrics['avg_order']:,.0f}")
 
         if "STATUS" in df.columns:
-            status = df["STATUS"].value_counts().reset_index()
-            status.columns = ["Status", "Count"]
+            counts = pc.value_counts(pa.array(df["STATUS"]).drop_null())
+            status = pd.DataFrame({
+                "Status": counts.field(0).to_pylist(),
+                "Count": counts.field(1).to_numpy(),
+            })
             fig = px.pie(status, values="Count", names="Status")
             st.plotly_chart(fig, use_container_width=True)
 
+    # =========================
+    # TAB 2 – SALES REPS
+    # =========================
+    with tab2:
+        if "rep" in aggs:
+            top_n = st.slider("Top sales reps", 5, MAX_TOP_N, 10, key="top_reps")
+            rep_perf = aggs["rep"].head(top_n)
+
+            fig = go.Figure(go.Bar(
+                x=rep_perf["SALE_REPRESENTATIVE"].to_numpy(),
+                y=rep_perf["REVENUE"].to_numpy(),
+                text=money_labels(rep_perf["REVENUE"]).to_numpy(),
+            ))
+            fig.update_layout(xaxis_title="SALE_REPRESENTATIVE", yaxis_title="REVENUE")
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(rep_perf, use_container_width=True, column_config=ROLLUP_LABELS)
+        else:
+            st.info("No sales rep data available")
+
+    # =========================
+    # TAB 3 – CUSTOMERS
+    # =========================
+    with tab3:
+        if "cust" in aggs:
+            top_n = st.slider("Top customers", 5, MAX_TOP_N, 10, key="top_customers")
+            cust_perf = aggs["cust"].head(top_n)
+            label = "CUSTOMER_NAME" if "CUSTOMER_NAME" in cust_perf.columns else "CUSTOMER_ID"
+
+            fig = go.Figure(go.Bar(
+                x=cust_perf[label].astype(str).to_numpy(),
+                y=cust_perf["REVENUE"].to_numpy(),
+                text=money_labels(cust_perf["REVENUE"]).to_numpy(),
+            ))
+            fig.update_layout(xaxis_title=label, yaxis_title="REVENUE")
+            st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(cust_perf, use_container_width=True, column_config=ROLLUP_LABELS)
+        else:
+            st.info("No customer data available")
+
     # =========================
     # TAB 4 – PRODUCTS
     # =========================
@@ -172,15 +333,14 @@ def main():
             st.metric("📦 Units", f"{df_sku['QUANTITY'].sum():,.0f}")
             st.metric("🏷️ SKUs", df_sku["SKU"].nunique())
 
-            top = (
-                df_sku.groupby("SKU")["LINE_TOTAL"]
-                .sum()
-                .sort_values(ascending=False)
-                .head(10)
-                .reset_index()
-            )
+            top = df_sku.groupby("SKU", sort=False)["LINE_TOTAL"].sum().nlargest(10)
 
-            fig = px.bar(top, x="SKU", y="LINE_TOTAL")
+            fig = go.Figure(go.Bar(
+                x=top.index.to_numpy(),
+                y=top.to_numpy(),
+                text=money_labels(top).to_numpy(),
+            ))
+            fig.update_layout(xaxis_title="SKU", yaxis_title="LINE_TOTAL")
             st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("No SKU data available")
@@ -189,9 +349,20 @@ def main():
     # TAB 5 – TRENDS
     # =========================
     with tab5:
-        if "YEAR_MONTH" in df.columns:
-            trend = df.groupby("YEAR_MONTH")["TOTAL_VALUES"].sum().reset_index()
-            fig = px.line(trend, x="YEAR_MONTH", y="TOTAL_VALUES", markers=True)
+        if "monthly" in aggs:
+            trend = aggs["monthly"]
+            if len(trend) > TREND_POINTS:
+                idx = MinMaxLTTBDownsampler().downsample(
+                    trend["REVENUE"].to_numpy(), n_out=TREND_POINTS
+                )
+                trend = trend.iloc[idx]
+
+            fig = go.Figure(go.Scattergl(
+                x=trend["YEAR_MONTH"].to_numpy(),
+                y=trend["REVENUE"].to_numpy(),
+                mode="lines+markers",
+            ))
+            fig.update_layout(xaxis_title="YEAR_MONTH", yaxis_title="REVENUE")
             st.plotly_chart(fig, use_container_width=True)
 
 
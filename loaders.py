@@ -0,0 +1,236 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import openpyxl
+import hashlib
+import tempfile
+import time
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.parquet as pq
+from streamlit.runtime.uploaded_file_manager import UploadedFile
+
+# =========================
+# DATA LOADERS
+# =========================
+CACHE_DIR = Path(".cache")
+
+# Bump whenever the reader or header normalization changes what a sidecar
+# holds; sidecars from other versions are ignored and pruned
+SIDECAR_VERSION = "v1"
+
+# Most recently used sidecars kept on disk; older ones are evicted on write
+SIDECAR_LIMIT = 32
+
+# Columns read by the metrics and tabs; everything else stays on disk
+SALES_COLUMNS = [
+    "ORDER_DATE", "DATE", "CREATION_DATE",
+    "TOTAL_VALUES", "TOTAL_COMMISSION", "TOTAL_ITEM",
+    "STATUS", "SALE_REPRESENTATIVE",
+    "CUSTOMER_ID", "CUSTOMER_NAME", "ORDER_NUMBER",
+]
+
+# Uploads are keyed by their per-upload file_id so reruns don't re-hash
+# their bytes; re-uploading identical bytes still hits the Parquet sidecar
+UPLOAD_HASH = {UploadedFile: lambda f: f.file_id}
+
+def source_name(source):
+    return source.name if isinstance(source, UploadedFile) else str(source)
+
+def parquet_sidecar(source):
+    if isinstance(source, UploadedFile):
+        data = source.getvalue()
+    else:
+        with open(source, "rb") as f:
+            data = f.read()
+    digest = hashlib.blake2b(data).hexdigest()
+    return CACHE_DIR / f"{SIDECAR_VERSION}-{digest}.parquet"
+
+def prune_sidecars():
+    def mtime(p):
+        try:
+            return p.stat().st_mtime
+        except OSError:
+            return 0
+
+    files = sorted(CACHE_DIR.glob("*.parquet"), key=mtime, reverse=True)
+    current = [p for p in files if p.name.startswith(f"{SIDECAR_VERSION}-")]
+    keep = set(current[:SIDECAR_LIMIT])
+    for p in files:
+        if p not in keep:
+            p.unlink(missing_ok=True)
+
+    # Temp files left behind by writers that died mid-write
+    cutoff = time.time() - 3600
+    for p in CACHE_DIR.glob("*.tmp"):
+        if 0 < mtime(p) < cutoff:
+            p.unlink(missing_ok=True)
+
+def stream_workbook(source):
+    # read_only mode yields plain values without building Cell objects
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+
+        size = max(ws.max_row or 0, 1)
+        buffers = [np.empty(size, dtype=object) for _ in header]
+        n = last = 0
+        for row in rows:
+            if n == size:
+                buffers = [np.concatenate([b, np.empty(size, dtype=object)]) for b in buffers]
+                size *= 2
+            for buf, value in zip(buffers, row):
+                buf[n] = value
+            n += 1
+            if any(v is not None for v in row):
+                last = n
+    finally:
+        wb.close()
+
+    df = pd.DataFrame({i: buf[:last] for i, buf in enumerate(buffers)})
+    df.columns = dedup_names([
+        str(name) if name is not None else f"Unnamed: {i}"
+        for i, name in enumerate(header)
+    ])
+    return df.infer_objects()
+
+def dedup_names(names):
+    # Same scheme as pd.read_excel: repeats become "A.1", "A.2", ...,
+    # skipping suffixes already taken by another header
+    taken = set(names)
+    counts = {}
+    out = []
+    for name in names:
+        base, count = name, counts.get(name, 0)
+        while count > 0:
+            counts[base] = count + 1
+            name = f"{base}.{count}"
+            count = count + 1 if name in taken else counts.get(name, 0)
+        out.append(name)
+        counts[name] = count + 1
+    return out
+
+def read_workbook(source):
+    try:
+        return pd.read_excel(source, engine="calamine")
+    except (ImportError, ValueError):
+        # python-calamine missing or pandas too old for the engine
+        if isinstance(source, UploadedFile):
+            source.seek(0)
+        return stream_workbook(source)
+
+def load_excel(source, columns=None):
+    try:
+        sidecar = parquet_sidecar(source)
+
+        if not sidecar.exists():
+            # An upload read earlier in the session is left at EOF
+            if isinstance(source, UploadedFile):
+                source.seek(0)
+            if source_name(source).lower().endswith(".csv"):
+                df = pd.read_csv(source, engine="pyarrow", dtype_backend="pyarrow")
+            else:
+                df = read_workbook(source)
+            df.columns = (
+                df.columns.str.strip()
+                .str.upper()
+                .str.replace(" ", "_")
+            )
+            tmp = None
+            try:
+                CACHE_DIR.mkdir(exist_ok=True)
+                # Unique per writer so concurrent loads never share a temp file
+                with tempfile.NamedTemporaryFile(
+                    dir=CACHE_DIR, suffix=".tmp", delete=False
+                ) as f:
+                    tmp = Path(f.name)
+                df.to_parquet(tmp, engine="pyarrow", compression="zstd")
+                tmp.replace(sidecar)
+                prune_sidecars()
+            except (OSError, ValueError, pa.ArrowException):
+                # Mixed-type sheet, repeated column names or read-only disk:
+                # serve it as parsed
+                if tmp is not None:
+                    tmp.unlink(missing_ok=True)
+                if columns is not None:
+                    df = df[[c for c in columns if c in df.columns]]
+                return df
+        else:
+            try:
+                sidecar.touch()  # mark as recently used for prune_sidecars
+            except OSError:
+                pass
+
+        if columns is not None:
+            names = pq.read_schema(sidecar).names
+            columns = [c for c in columns if c in names]
+        return pq.read_table(sidecar, columns=columns).to_pandas()
+    except Exception as e:
+        st.error(f"Error loading {source_name(source)}: {e}")
+        return pd.DataFrame()
+
+def prepare_sales_data(df):
+    date_cols = ["ORDER_DATE", "DATE", "CREATION_DATE"]
+    date_col = next((c for c in date_cols if c in df.columns), None)
+    if date_col is not None:
+        df[date_col] = df["ORDER_DATE"] = pd.to_datetime(
+            df[date_col], errors="coerce", cache=True, format="mixed"
+        )
+
+    numeric_cols = ["TOTAL_VALUES", "TOTAL_COMMISSION", "TOTAL_ITEM"]
+    present_num = [c for c in numeric_cols if c in df.columns]
+    if present_num:
+        df[present_num] = (
+            df[present_num].apply(pd.to_numeric, errors="coerce").fillna(0)
+        )
+
+    if "ORDER_DATE" in df.columns:
+        # Monthly period ordinal; labels are only built on the small rollup
+        dates = df["ORDER_DATE"].dt
+        df["YEAR_MONTH_CODE"] = ((dates.year - 1970) * 12 + dates.month - 1).astype("Int32")
+
+    for col in ["SALE_REPRESENTATIVE", "STATUS", "CUSTOMER_ID", "CUSTOMER_NAME"]:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+
+    return df
+
+def prepare_sku_data(df):
+    mapping = {
+        "ORDER_LINES/PRODUCT/REFERENCE": "SKU",
+        "ORDER_LINES/PRODUCT/NAME": "PRODUCT_NAME",
+        "ORDER_LINES/QUANTITY": "QUANTITY",
+        "ORDER_LINES/UNIT_PRICE": "UNIT_PRICE",
+        "ORDER_LINES/TOTAL": "LINE_TOTAL",
+        "CREATION_DATE": "ORDER_DATE",
+    }
+
+    df = df.rename(columns=mapping)
+
+    present_num = [c for c in ["QUANTITY", "UNIT_PRICE", "LINE_TOTAL"] if c in df.columns]
+    if present_num:
+        df[present_num] = (
+            df[present_num].apply(pd.to_numeric, errors="coerce").fillna(0)
+        )
+
+    if {"LINE_TOTAL", "QUANTITY", "UNIT_PRICE"} <= set(df.columns):
+        # any() stops at the first non-zero line instead of summing the column
+        if not df["LINE_TOTAL"].to_numpy().any():
+            df["LINE_TOTAL"] = df["QUANTITY"] * df["UNIT_PRICE"]
+
+    return df
+
+@st.cache_data(hash_funcs=UPLOAD_HASH)
+def load_sales_data(source):
+    # The fingerprint is computed once per load and identifies the data
+    # across reruns, so per-session state can tell when it was reloaded
+    df = prepare_sales_data(load_excel(source, columns=SALES_COLUMNS))
+    return df, int(pd.util.hash_pandas_object(df).sum())
+
+@st.cache_data(hash_funcs=UPLOAD_HASH)
+def load_sku_data(source):
+    return prepare_sku_data(load_excel(source))
@@ -0,0 +1,115 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).resolve().parents[1] / "app.py")
+
+
+@pytest.fixture
+def workbooks(tmp_path, monkeypatch):
+    # The app reads its workbooks relative to the working directory
+    orders = pd.DataFrame({
+        "ORDER_DATE": pd.to_datetime(["2025-01-15", "2025-02-10", "2025-02-11"]),
+        "ORDER_NUMBER": ["MTX1", "MTX2", "MTX3"],
+        "CUSTOMER_ID": [1, 2, 1],
+        "CUSTOMER_NAME": ["Alpha", "Beta", "Alpha"],
+        "SALE_REPRESENTATIVE": ["Rep A", "Rep B", "Rep A"],
+        "STATUS": ["Paid", "Paid", "Paid"],
+        "TOTAL_ITEM": [1, 2, 3],
+        "TOTAL_VALUES": [100.0, 250.0, 50.0],
+        "TOTAL_COMMISSION": [5.0, 12.5, 2.5],
+    })
+    orders.to_excel(tmp_path / "Sales_Analysis_Results.xlsx", index=False)
+    pd.DataFrame({"Sales_Rep": ["Rep A"]}).to_excel(
+        tmp_path / "Client_Status_Analysis.xlsx", index=False
+    )
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def run_app():
+    return AppTest.from_file(APP, default_timeout=60).run()
+
+
+def test_empty_rep_selection_renders(workbooks):
+    at = run_app()
+    at.multiselect[0].set_value([]).run()
+
+    assert not at.exception
+    assert at.metric[1].value == "0"
+    assert at.metric[3].label == "📊 Avg Order"
+    assert at.metric[3].value == "$0"
+
+
+def test_charts_keep_streamlit_template(workbooks):
+    at = run_app()
+    layout = json.loads(at.get("plotly_chart")[0].proto.spec)["layout"]["template"]["layout"]
+
+    assert layout["height"] == 400
+    # Streamlit's placeholder colors, swapped for the active theme client-side
+    assert layout["colorway"][0] == "#000001"
+
+
+def test_reloaded_data_refreshes_open_session(workbooks):
+    at = run_app()
+    assert at.metric[0].value == "$400"
+
+    path = workbooks / "Sales_Analysis_Results.xlsx"
+    orders = pd.read_excel(path)
+    orders["TOTAL_VALUES"] *= 2
+    orders.to_excel(path, index=False)
+    st.cache_data.clear()
+
+    at.run()
+    assert at.metric[0].value == "$800"
+
+
+
+def rollup_frame(**overrides):
+    data = {
+        "SALE_REPRESENTATIVE": ["Rep A", "Rep B"],
+        "CUSTOMER_ID": [1, 2],
+        "CUSTOMER_NAME": ["Alpha", "Beta"],
+        "YEAR_MONTH_CODE": [660, 661],
+        "TOTAL_VALUES": [100.0, 250.0],
+        "ORDER_NUMBER": ["MTX1", "MTX2"],
+        "TOTAL_COMMISSION": [1.0, 1.0],
+    }
+    data.update(overrides)
+    df = pd.DataFrame(data)
+    for col in ["SALE_REPRESENTATIVE", "CUSTOMER_ID", "CUSTOMER_NAME"]:
+        df[col] = df[col].astype("category")
+    df["YEAR_MONTH_CODE"] = df["YEAR_MONTH_CODE"].astype("Int32")
+    return df
+
+
+@pytest.mark.parametrize("overrides", [
+    {"TOTAL_COMMISSION": [1.0, 7.0]},
+    {"CUSTOMER_NAME": ["Alpha", "Gamma"]},
+    {"ORDER_NUMBER": ["MTX1", None]},
+])
+def test_rollup_cache_key_covers_every_rollup_input(overrides):
+    import app
+
+    # No cache clear: the key alone must tell the two frames apart
+    base, changed = rollup_frame(), rollup_frame(**overrides)
+    before = app.aggregate_all(app.frame_hash(base), base)
+    after = app.aggregate_all(app.frame_hash(changed), changed)
+
+    assert not (before["rep"].equals(after["rep"]) and before["cust"].equals(after["cust"]))
+
+
+def test_rollup_columns_are_named_after_their_contents():
+    import app
+
+    df = rollup_frame(SALE_REPRESENTATIVE=["Rep A", "Rep A"])
+    aggs = app.aggregate_all(app.frame_hash(df), df)
+
+    rep = aggs["rep"].iloc[0]
+    assert list(aggs["rep"].columns) == ["SALE_REPRESENTATIVE", "REVENUE", "ORDERS", "CUSTOMERS", "COMMISSION"]
+    assert (rep["REVENUE"], rep["ORDERS"], rep["CUSTOMERS"], rep["COMMISSION"]) == (350.0, 2, 2, 2.0)
+    assert list(aggs["cust"].columns) == ["CUSTOMER_ID", "CUSTOMER_NAME", "REVENUE", "ORDERS"]
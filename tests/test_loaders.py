@@ -0,0 +1,127 @@
+import os
+
+import pandas as pd
+import pytest
+
+import loaders
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(loaders, "CACHE_DIR", tmp_path / ".cache")
+    return loaders.CACHE_DIR
+
+
+def write_orders(path, scale=1.0):
+    pd.DataFrame({"Total Values": [100.0 * scale, 50.0 * scale]}).to_excel(path, index=False)
+
+
+def test_sidecar_key_carries_version(tmp_path, cache_dir):
+    path = tmp_path / "orders.xlsx"
+    write_orders(path)
+
+    df = loaders.load_excel(path)
+
+    assert df["TOTAL_VALUES"].tolist() == [100.0, 50.0]
+    [sidecar] = cache_dir.glob("*.parquet")
+    assert sidecar.name.startswith(f"{loaders.SIDECAR_VERSION}-")
+
+
+def test_stale_and_excess_sidecars_are_pruned(tmp_path, cache_dir, monkeypatch):
+    monkeypatch.setattr(loaders, "SIDECAR_LIMIT", 2)
+    cache_dir.mkdir()
+    stale = cache_dir / "v0-old.parquet"
+    stale.write_bytes(b"")
+
+    for i in range(3):
+        path = tmp_path / f"orders{i}.xlsx"
+        write_orders(path, scale=i + 1)
+        loaders.load_excel(path)
+        sidecar = loaders.parquet_sidecar(path)
+        os.utime(sidecar, (i, i))
+
+    # A fourth sidecar pushes out the least recently used one
+    write_orders(tmp_path / "orders3.xlsx", scale=4)
+    loaders.load_excel(tmp_path / "orders3.xlsx")
+
+    names = {p.name for p in cache_dir.glob("*.parquet")}
+    assert stale.name not in names
+    assert len(names) == 2
+    assert loaders.parquet_sidecar(tmp_path / "orders3.xlsx").name in names
+    assert loaders.parquet_sidecar(tmp_path / "orders2.xlsx").name in names
+
+
+def make_upload(name, data, file_id="upload-1"):
+    from streamlit.proto.Common_pb2 import FileURLs
+    from streamlit.runtime.uploaded_file_manager import UploadedFile, UploadedFileRec
+
+    return UploadedFile(UploadedFileRec(file_id, name, "text/csv", data), FileURLs())
+
+
+def test_upload_is_rewound_before_reparsing(tmp_path, cache_dir):
+    upload = make_upload("orders.csv", b"Total Values\n100\n50\n")
+
+    first = loaders.load_excel(upload)
+    for sidecar in cache_dir.glob("*.parquet"):
+        sidecar.unlink()
+    second = loaders.load_excel(upload)
+
+    assert second["TOTAL_VALUES"].tolist() == first["TOTAL_VALUES"].tolist() == [100, 50]
+
+
+def test_reupload_with_same_name_and_size_is_reloaded(tmp_path, cache_dir):
+    first = make_upload("orders.csv", b"TOTAL_VALUES\n100\n", file_id="upload-1")
+    second = make_upload("orders.csv", b"TOTAL_VALUES\n200\n", file_id="upload-2")
+
+    df, _ = loaders.load_sales_data(first)
+    assert df["TOTAL_VALUES"].tolist() == [100]
+    df, _ = loaders.load_sales_data(second)
+    assert df["TOTAL_VALUES"].tolist() == [200]
+
+
+def test_repeated_columns_are_served_as_parsed(tmp_path, cache_dir):
+    # Both headers normalize to TOTAL_VALUES, which Parquet cannot store
+    path = tmp_path / "orders.xlsx"
+    pd.DataFrame({"Total Values": [1.0], "TOTAL_VALUES": [2.0]}).to_excel(path, index=False)
+
+    df = loaders.load_excel(path)
+
+    assert df.shape == (1, 2)
+    assert list(df.columns) == ["TOTAL_VALUES", "TOTAL_VALUES"]
+    assert not list(cache_dir.iterdir())
+
+
+def test_stream_workbook_matches_read_excel(tmp_path):
+    import openpyxl
+    from openpyxl.styles import Font
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["Status", "Amount", None, "Status", "Status.1", "Status"])
+    ws.append(["Paid", 10, "x", "Open", "a", "b"])
+    ws.append(["Void", 2.5, None, None, "c", "d"])
+    # Styled but empty cells make openpyxl report trailing blank rows
+    for row in range(4, 8):
+        ws.cell(row=row, column=1).font = Font(bold=True)
+    path = tmp_path / "sheet.xlsx"
+    wb.save(path)
+
+    streamed = loaders.stream_workbook(path)
+    expected = pd.read_excel(path, engine="openpyxl")
+
+    assert list(streamed.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(streamed, expected, check_dtype=False)
+
+
+def test_fallback_loads_duplicate_headers(tmp_path, cache_dir, monkeypatch):
+    def no_calamine(*args, **kwargs):
+        raise ImportError("python-calamine not installed")
+
+    monkeypatch.setattr(loaders.pd, "read_excel", no_calamine)
+    path = tmp_path / "orders.xlsx"
+    pd.DataFrame([["Paid", "Open"]], columns=["Status", "Status"]).to_excel(path, index=False)
+
+    df = loaders.load_excel(path)
+
+    assert list(df.columns) == ["STATUS", "STATUS.1"]
+    assert df.iloc[0].tolist() == ["Paid", "Open"]